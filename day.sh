@@ -3,6 +3,14 @@
 if [ $# -eq 0 ]
 then
     echo "usage: $0 DAY_NUM [test]"
+    echo "       $0 all [WORKERS]"
+    exit 0
+fi
+
+if [ "$1" = "all" ]
+then
+    echo "Running all solutions"
+    python3 ./src/run.py all ${2:+--workers $2}
     exit 0
 fi
 
@@ -0,0 +1,164 @@
+import argparse
+import json
+import math
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from run import input_path, load_day, parse_days, run_day
+
+Stats = Dict[str, float]
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Stats:
+    return {'median': statistics.median(samples), 'p95': percentile(samples, 95), 'runs': len(samples)}
+
+
+def bench_day(day: int, repeat: int, scale: int = 0) -> Dict:
+    # scale > 0 reads the input from the day's gen_input(scale) hook instead of input/dayN.txt.
+    path, tmp = input_path(day), None
+    if scale:
+        gen = getattr(load_day(day), 'gen_input', None)
+        if not gen:
+            return {'skipped': f'day{day} has no gen_input'}
+        with tempfile.NamedTemporaryFile('w', suffix=f'.day{day}.txt', delete=False) as tmp:
+            tmp.write(gen(scale))
+        path = tmp.name
+    samples, error = defaultdict(list), None
+    try:
+        for _ in range(repeat):
+            report = run_day(day, path)
+            if report.error:
+                error = report.error
+                break
+            for name, secs in report.timings:
+                samples[name].append(secs)
+            samples['total'].append(report.total)
+    finally:
+        if tmp:
+            os.unlink(tmp.name)
+    result = {part: summarize(secs) for part, secs in samples.items()}
+    result['rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if error:
+        result['error'] = error
+    return result
+
+
+def bench_in_process(day: int, repeat: int, scale: int) -> Dict:
+    # A fresh process per day keeps the RSS high-water mark attributable to that day.
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(bench_day, day, repeat, scale).result()
+
+
+def bench_days(days: List[int], repeat: int, scale: int = 0, workers: int = 1) -> Dict[str, Dict]:
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {d: pool.submit(bench_in_process, d, repeat, scale) for d in days}
+        return {f'day{d}': f.result() for d, f in futures.items()}
+
+
+def compare(current: Dict[str, Dict], baseline: Dict[str, Dict],
+            threshold: float) -> List[Tuple[str, str, float, Optional[float]]]:
+    # A baseline part with no current result (the day crashed or was not run) gets median None.
+    regressions = []
+    for day, parts in baseline.items():
+        for part, old in parts.items():
+            if not isinstance(old, dict):
+                continue
+            stats = current.get(day, {}).get(part)
+            if not isinstance(stats, dict):
+                regressions.append((day, part, old['median'], None))
+            elif stats['median'] > old['median'] * threshold:
+                regressions.append((day, part, old['median'], stats['median']))
+    return regressions
+
+
+def format_results(results: Dict[str, Dict]) -> str:
+    lines = []
+    for day, parts in results.items():
+        if 'skipped' in parts:
+            lines.append(f'{day:<6} skipped: {parts["skipped"]}')
+            continue
+        lines.append(f'{day:<6} peak rss {parts["rss_kb"] / 1024:.1f} MB')
+        for part, stats in parts.items():
+            if isinstance(stats, dict):
+                lines.append(f'    {part:<6} median {stats["median"]:.4f}s  p95 {stats["p95"]:.4f}s  ({stats["runs"]} runs)')
+        if 'error' in parts:
+            lines.append(f'    error: {parts["error"]}')
+    return '\n'.join(lines)
+
+
+class Test(unittest.TestCase):
+
+    def test_percentile(self):
+        samples = [float(i) for i in range(1, 21)]
+        self.assertEqual(19.0, percentile(samples, 95))
+        self.assertEqual(1.0, percentile([1.0], 95))
+
+    def test_summarize(self):
+        self.assertEqual({'median': 2.0, 'p95': 3.0, 'runs': 3}, summarize([3.0, 1.0, 2.0]))
+
+    def test_compare(self):
+        baseline = {'day1': {'part1': {'median': 1.0}, 'part2': {'median': 1.0}, 'rss_kb': 10}}
+        current = {'day1': {'part1': {'median': 1.1}, 'part2': {'median': 1.5}, 'rss_kb': 10},
+                   'day2': {'part1': {'median': 9.0}}}
+        self.assertEqual([('day1', 'part2', 1.0, 1.5)], compare(current, baseline, 1.2))
+
+    def test_compare_missing(self):
+        baseline = {'day1': {'part1': {'median': 1.0}, 'rss_kb': 10}, 'day2': {'part1': {'median': 2.0}}}
+        current = {'day1': {'rss_kb': 5, 'error': 'ZeroDivisionError'}}
+        self.assertEqual([('day1', 'part1', 1.0, None), ('day2', 'part1', 2.0, None)],
+                         compare(current, baseline, 1.25))
+
+    def test_bench_day(self):
+        result = bench_day(3, 2)
+        self.assertEqual(2, result['part1']['runs'])
+        self.assertEqual(2, result['part2']['runs'])
+        self.assertGreater(result['rss_kb'], 0)
+
+    def test_bench_day_generated(self):
+        result = bench_day(3, 1, scale=100)
+        self.assertNotIn('error', result)
+        self.assertEqual(1, result['total']['runs'])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description='Benchmark days and check them against a baseline.')
+        parser.add_argument('days', nargs='*', help="day numbers or 'all'")
+        parser.add_argument('-n', '--repeat', type=int, default=5, help='runs per day')
+        parser.add_argument('-s', '--scale', type=int, default=0, help="use the day's gen_input(scale)")
+        parser.add_argument('-w', '--workers', type=int, default=1, help='days benchmarked concurrently')
+        parser.add_argument('--save', help='write the results as a JSON baseline')
+        parser.add_argument('--baseline', help='JSON baseline to compare against')
+        parser.add_argument('--threshold', type=float, default=1.25, help='allowed slowdown factor')
+        opts = parser.parse_args()
+        results = bench_days(parse_days(opts.days), opts.repeat, opts.scale, opts.workers)
+        print(format_results(results))
+        if opts.save:
+            with open(opts.save, 'w') as outfile:
+                json.dump(results, outfile, indent=2)
+        failed = any('error' in parts for parts in results.values())
+        if opts.baseline:
+            with open(opts.baseline, 'r') as infile:
+                baseline = {day: parts for day, parts in json.load(infile).items() if day in results}
+            slower = compare(results, baseline, opts.threshold)
+            for day, part, old, new in slower:
+                now = 'missing' if new is None else f'{new:.4f}s'
+                print(f'REGRESSION {day} {part}: {old:.4f}s -> {now}')
+            failed = failed or bool(slower)
+        if failed:
+            sys.exit(1)
+    else:
+        unittest.main()
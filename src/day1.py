@@ -1,6 +1,8 @@
 import sys
 import unittest
-from typing import Tuple, Iterable, Sequence
+from collections import defaultdict
+from itertools import combinations
+from typing import Tuple, Iterable, Iterator, List, Optional, Sequence, Union
 
 
 def two_sum(nums: Iterable[int], n: int) -> Tuple[int, int]:
@@ -29,13 +31,68 @@ def three_sum(nums: Sequence[int], n: int) -> Tuple[int, int, int]:
                     return a, b, c
 
 
+def k_sum(nums: Iterable[int], n: int, k: int,
+          find_all: bool = False) -> Union[Optional[Tuple[int, ...]], List[Tuple[int, ...]]]:
+    # k <= 3 sorts and uses two pointers, larger k meets in the middle over sums of k // 2 numbers.
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    nums = sorted(nums)
+    if k <= 3:
+        found = sorted_k_sum(nums, 0, n, k)
+    else:
+        found = meet_in_the_middle(nums, n, k)
+    if find_all:
+        return list(dict.fromkeys(found))
+    return next(found, None)
+
+
+def sorted_k_sum(nums: List[int], lo: int, n: int, k: int) -> Iterator[Tuple[int, ...]]:
+    if k == 1:
+        for x in nums[lo:]:
+            if x == n:
+                yield x,
+                return
+    elif k == 2:
+        i, j = lo, len(nums) - 1
+        while i < j:
+            s = nums[i] + nums[j]
+            if s < n:
+                i += 1
+            elif s > n:
+                j -= 1
+            else:
+                yield nums[i], nums[j]
+                i += 1
+                while i < j and nums[i] == nums[i - 1]:
+                    i += 1
+                j -= 1
+    else:
+        for i in range(lo, len(nums) - k + 1):
+            if i > lo and nums[i] == nums[i - 1]:
+                continue
+            for rest in sorted_k_sum(nums, i + 1, n - nums[i], k - 1):
+                yield (nums[i],) + rest
+
+
+def meet_in_the_middle(nums: List[int], n: int, k: int) -> Iterator[Tuple[int, ...]]:
+    half = k // 2
+    right = defaultdict(list)
+    for idx in combinations(range(len(nums)), k - half):
+        right[sum(nums[i] for i in idx)].append(idx)
+    for left in combinations(range(len(nums)), half):
+        s = sum(nums[i] for i in left)
+        for idx in right.get(n - s, ()):
+            if idx[0] > left[-1]:
+                yield tuple(nums[i] for i in left + idx)
+
+
 def part1(nums: Iterable[int], n: int):
     a, b = two_sum(nums, n)
     print(a * b)
 
 
-def part2(nums: Sequence[int], n: int):
-    a, b, c = three_sum(nums, n)
+def part2(nums: Iterable[int], n: int):
+    a, b, c = k_sum(nums, n, 3)
     print(a * b * c)
 
 
@@ -47,6 +104,20 @@ class Test(unittest.TestCase):
     def test_three_sum(self):
         self.assertEqual((979, 366, 675), three_sum([1721, 979, 366, 299, 675, 1456], 2020))
 
+    def test_k_sum(self):
+        nums = [1721, 979, 366, 299, 675, 1456]
+        self.assertEqual((299, 1721), k_sum(nums, 2020, 2))
+        self.assertEqual((366, 675, 979), k_sum(iter(nums), 2020, 3))
+        self.assertIsNone(k_sum(nums, 1, 3))
+        self.assertEqual((1, 2, 3, 4, 5), k_sum(range(1, 10), 15, 5))
+        self.assertEqual([(1, 5), (2, 4)], k_sum([1, 2, 3, 4, 5, 1, 5], 6, 2, find_all=True))
+        self.assertEqual([(1, 1, 4), (1, 2, 3)], k_sum([1, 1, 2, 3, 4], 6, 3, find_all=True))
+        self.assertEqual([(1, 1, 2, 4), (1, 1, 3, 3)], k_sum([1, 1, 2, 3, 4, 3], 8, 4, find_all=True))
+
+    def test_k_sum_invalid_k(self):
+        self.assertRaises(ValueError, k_sum, [1, 2, 3], 0, 0)
+        self.assertRaises(ValueError, k_sum, [1, 2, 3], 0, -1)
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
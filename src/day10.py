@@ -1,6 +1,7 @@
 import sys
 import unittest
-from typing import List, Tuple, Set, Dict
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
 
 
 def find_distribution(jolts: List[int]) -> Tuple[int, int]:
@@ -18,28 +19,26 @@ def find_distribution(jolts: List[int]) -> Tuple[int, int]:
     return ones, threes
 
 
-def count_arrangements(jolts: List[int]) -> int:
-    outlet = max(jolts) + 3
-    jolts = jolts[:]
-    jolts.append(0)
-    jolts.append(outlet)
-
-    def count(n: int, values: Set[int], cache: Dict[int, int]) -> int:
-        if n in cache:
-            return cache[n]
-        if n == 0:
-            cache[n] = 1
-            return 1
-        if n < 0:
-            cache[n] = 0
-            return 0
-        if n not in values:
-            cache[n] = 0
-            return 0
-        cache[n] = count(n - 1, values, cache) + count(n - 2, values, cache) + count(n - 3, values, cache)
-        return cache[n]
-
-    return count(outlet, set(jolts), {})
+def count_arrangements(jolts: List[int], modulus: Optional[int] = None) -> int:
+    # Only the last three adapters can feed the next one, so only their counts are kept.
+    values = sorted(set(jolts))
+    values.append(values[-1] + 3)
+    window = deque([(0, 1)], maxlen=3)
+    for v in values:
+        if v <= 0:
+            continue
+        ways = 0
+        for u, w in window:
+            if v - u <= 3:
+                ways += w
+        if modulus:
+            ways %= modulus
+        window.append((v, ways))
+    return window[-1][1]
+
+
+def count_arrangements_many(jolt_sets: Iterable[List[int]], modulus: Optional[int] = None) -> List[int]:
+    return [count_arrangements(jolts, modulus) for jolts in jolt_sets]
 
 
 def part1(jolts: List[int]) -> None:
@@ -70,6 +69,14 @@ class Test(unittest.TestCase):
         ]
         for jolts, cnt in data:
             self.assertEqual(cnt, count_arrangements(jolts))
+        self.assertEqual([8, 19208], count_arrangements_many(jolts for jolts, _ in data))
+
+    def test_count_arrangements_long_chain(self):
+        chain = list(range(1, 20000))
+        m = 1_000_000_007
+        self.assertEqual(count_arrangements(chain) % m, count_arrangements(chain, m))
+        self.assertEqual(4, count_arrangements([1, 2, 3]))
+        self.assertEqual(0, count_arrangements([1, 5]))
 
 
 if __name__ == '__main__':
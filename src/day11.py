@@ -1,7 +1,12 @@
 import sys
 import unittest
+from array import array
 
-from typing import List
+from typing import List, Tuple
+
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+SEAT_BITS = str.maketrans('.L#', '011')
+OCCUPIED_BITS = str.maketrans('.L#', '001')
 
 
 def parse_grid(s: str) -> List[List[str]]:
@@ -120,12 +125,119 @@ def count_occupied_vis(r: int, c: int, grid: List[List[str]]) -> int:
     return cnt
 
 
+def neighbor_index(grid: List[List[str]], visible: bool) -> Tuple[List[Tuple[int, int]], array, array]:
+    # CSR: the neighbours of seat i are nbrs[offsets[i]:offsets[i + 1]].
+    w, h = len(grid[0]), len(grid)
+    seats = [(r, c) for r in range(h) for c in range(w) if grid[r][c] != '.']
+    ids = {rc: i for i, rc in enumerate(seats)}
+    offsets, nbrs = array('i', [0]), array('i')
+    for r, c in seats:
+        for dr, dc in DIRECTIONS:
+            nr, nc = r + dr, c + dc
+            while visible and 0 <= nr < h and 0 <= nc < w and grid[nr][nc] == '.':
+                nr, nc = nr + dr, nc + dc
+            if 0 <= nr < h and 0 <= nc < w and grid[nr][nc] != '.':
+                nbrs.append(ids[(nr, nc)])
+        offsets.append(len(nbrs))
+    return seats, offsets, nbrs
+
+
+def simulate_indexed(grid: List[List[str]], visible: bool, max_occupied: int) -> int:
+    seats, offsets, nbrs = neighbor_index(grid, visible)
+    state = bytearray(1 if grid[r][c] == '#' else 0 for r, c in seats)
+    n = len(seats)
+    while True:
+        counts = bytearray(n)
+        for i in range(n):
+            if state[i]:
+                for j in nbrs[offsets[i]:offsets[i + 1]]:
+                    counts[j] += 1
+        changed = False
+        for i in range(n):
+            if state[i]:
+                if counts[i] >= max_occupied:
+                    state[i] = 0
+                    changed = True
+            elif not counts[i]:
+                state[i] = 1
+                changed = True
+        if not changed:
+            return sum(state)
+
+
+def simulate_frontier(grid: List[List[str]], visible: bool, max_occupied: int) -> Tuple[int, List[int]]:
+    # changes[g] is how many seats flipped in generation g.
+    seats, offsets, nbrs = neighbor_index(grid, visible)
+    n = len(seats)
+    state = bytearray(1 if grid[r][c] == '#' else 0 for r, c in seats)
+    counts = bytearray(n)
+    for i in range(n):
+        if state[i]:
+            for j in nbrs[offsets[i]:offsets[i + 1]]:
+                counts[j] += 1
+    dirty, changes = range(n), []
+    while True:
+        flips = [i for i in dirty if (counts[i] >= max_occupied if state[i] else not counts[i])]
+        if not flips:
+            return sum(state), changes
+        changes.append(len(flips))
+        dirty = set(flips)
+        for i in flips:
+            state[i] ^= 1
+            delta = 1 if state[i] else -1
+            neighbours = nbrs[offsets[i]:offsets[i + 1]]
+            for j in neighbours:
+                counts[j] += delta
+            dirty.update(neighbours)
+
+
+def simulate_bitboard(grid: List[List[str]], max_occupied: int) -> int:
+    # Bit r * (w + 1) + c per cell; the spare column stops horizontal shifts wrapping.
+    w, h = len(grid[0]), len(grid)
+    stride = w + 1
+    seat, occ = to_bitboard(grid, SEAT_BITS), to_bitboard(grid, OCCUPIED_BITS)
+    shifts = [dr * stride + dc for dr, dc in DIRECTIONS]
+    while True:
+        # Neighbour counts as a bit-sliced 4-bit counter, least significant plane first
+        planes = [0, 0, 0, 0]
+        for off in shifts:
+            carry = occ >> off if off > 0 else occ << -off
+            for i in range(3):
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+            planes[3] |= carry
+        empty = ~(planes[0] | planes[1] | planes[2] | planes[3])
+        crowded = at_least(planes, max_occupied)
+        nxt = seat & ((occ & ~crowded) | (~occ & empty))
+        if nxt == occ:
+            return occ.bit_count()
+        occ = nxt
+
+
+def to_bitboard(grid: List[List[str]], table: dict) -> int:
+    # Row r, column c lands on bit r * (w + 1) + c; the string is reversed so bit 0 comes last.
+    rows = ''.join(''.join(row).translate(table) + '0' for row in grid)
+    return int(rows[::-1], 2)
+
+
+def at_least(planes: List[int], k: int) -> int:
+    if k >= 1 << len(planes):
+        return 0
+    greater, equal = 0, -1
+    for i in reversed(range(len(planes))):
+        if (k >> i) & 1:
+            equal &= planes[i]
+        else:
+            greater |= equal & planes[i]
+            equal &= ~planes[i]
+    return greater | equal
+
+
 def part1(grid: List[List[str]]) -> None:
-    print(simulate(grid, count_occupied_adj, 4))
+    print(simulate_bitboard(grid, 4))
 
 
 def part2(grid: List[List[str]]) -> None:
-    print(simulate(grid, count_occupied_vis, 5))
+    print(simulate_indexed(grid, True, 5))
 
 
 class Test(unittest.TestCase):
@@ -178,6 +290,45 @@ L.LLLLL.LL""")
     def test_simulate_occupied_vis(self):
         self.assertEqual(26, simulate(self.grid, count_occupied_vis, 5))
 
+    def test_neighbor_index(self):
+        grid = parse_grid("""
+L.L
+...
+L.#""")
+        seats, offsets, nbrs = neighbor_index(grid, visible=False)
+        self.assertEqual([(0, 0), (0, 2), (2, 0), (2, 2)], seats)
+        self.assertEqual([0] * 5, list(offsets))
+        seats, offsets, nbrs = neighbor_index(grid, visible=True)
+        self.assertEqual([1, 2, 3], list(nbrs[offsets[0]:offsets[1]]))
+        self.assertEqual([0, 1, 2], list(nbrs[offsets[3]:offsets[4]]))
+
+    def test_simulate_frontier(self):
+        occupied, changes = simulate_frontier(self.grid, False, 4)
+        self.assertEqual(37, occupied)
+        self.assertEqual([71, 51, 31, 21, 7], changes)
+        occupied, changes = simulate_frontier(self.grid, True, 5)
+        self.assertEqual(26, occupied)
+        self.assertEqual([71, 64, 46, 35, 13, 5], changes)
+
+    def test_simulate_bitboard(self):
+        self.assertEqual(37, simulate_bitboard(self.grid, 4))
+        grid = parse_grid("""
+#.##
+####
+L##.""")
+        self.assertEqual(simulate_indexed(grid, False, 3), simulate_bitboard(grid, 3))
+
+    def test_at_least(self):
+        planes = [0b1010, 0b0110, 0b0001, 0]  # counts per bit, low to high: 4, 3, 2, 1
+        self.assertEqual(0b0111, at_least(planes, 2) & 0b1111)
+        self.assertEqual(0b0011, at_least(planes, 3) & 0b1111)
+        self.assertEqual(0b0001, at_least(planes, 4) & 0b1111)
+        self.assertEqual(0, at_least(planes, 16))
+
+    def test_simulate_indexed(self):
+        self.assertEqual(37, simulate_indexed(self.grid, False, 4))
+        self.assertEqual(26, simulate_indexed(self.grid, True, 5))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
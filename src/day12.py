@@ -1,8 +1,21 @@
-import math
 import sys
 import unittest
+from array import array
 
-from typing import List
+from typing import List, Tuple
+
+# Counter-clockwise rotation by k quarter turns as (a, b, c, d): x' = a*x + b*y, y' = c*x + d*y
+ROTATIONS = ((1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0))
+HEADINGS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+NORTH, SOUTH, EAST, WEST, TURN, FORWARD = range(6)
+OPCODES = {'N': NORTH, 'S': SOUTH, 'E': EAST, 'W': WEST, 'L': TURN, 'R': TURN, 'F': FORWARD}
+MOVES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+def quarter_turns(degrees: int) -> int:
+    if degrees % 90:
+        raise ValueError(f"unsupported angle: {degrees}")
+    return degrees // 90 % 4
 
 
 class Waypoint:
@@ -14,10 +27,10 @@ class Waypoint:
 
     def rotate(self, degrees):
         self.angle += degrees
-        rad = math.radians(degrees)
+        a, b, c, d = ROTATIONS[quarter_turns(degrees)]
         x, y = self.dx, self.dy
-        self.dx = x * int(math.cos(rad)) - y * int(math.sin(rad))
-        self.dy = x * int(math.sin(rad)) + y * int(math.cos(rad))
+        self.dx = a * x + b * y
+        self.dy = c * x + d * y
 
     def __str__(self):
         return f"dx={self.dx}, dy={self.dy}, angle={self.angle}"
@@ -69,9 +82,9 @@ class Ship:
                 self.x = self.x + val * self.wp.dx
                 self.y = self.y + val * self.wp.dy
             else:
-                rad = math.radians(self.angle)
-                self.x = self.x + val * int(math.cos(rad))
-                self.y = self.y + val * int(math.sin(rad))
+                hx, hy = HEADINGS[quarter_turns(self.angle)]
+                self.x = self.x + val * hx
+                self.y = self.y + val * hy
 
     def manhattan_dist_from_origin(self) -> int:
         return abs(self.x) + abs(self.y)
@@ -80,18 +93,138 @@ class Ship:
         return f"x={self.x}, y={self.y}, angle={self.angle}, wp={self.wp}"
 
 
-def part1(plan: List[str]) -> None:
-    ship = Ship()
+def compile_plan(plan: List[str]) -> Tuple[array, array]:
+    # Turns become counter-clockwise quarter turns (0-3).
+    ops, vals = array('b'), array('q')
     for cmd in plan:
-        ship.navigate(cmd)
-    print(ship.manhattan_dist_from_origin())
+        op, val = compile_command(cmd)
+        ops.append(op)
+        vals.append(val)
+    return ops, vals
 
 
-def part2(plan: List[str]) -> None:
-    ship = Ship(wp=Waypoint(10, 1))
-    for cmd in plan:
-        ship.navigate(cmd)
-    print(ship.manhattan_dist_from_origin())
+def compile_command(cmd: str) -> Tuple[int, int]:
+    act, val = cmd[0], int(cmd[1:])
+    op = OPCODES[act]
+    if op == TURN:
+        val = quarter_turns(val if act == 'L' else -val)
+    return op, val
+
+
+def navigate(ops: array, vals: array, wp: Tuple[int, int] = (10, 1)) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    # Heading and waypoint interpretations in one pass.
+    x, y, hx, hy = 0, 0, 1, 0
+    wx, wy, (dx, dy) = 0, 0, wp
+    for op, val in zip(ops, vals):
+        if op == FORWARD:
+            x += val * hx
+            y += val * hy
+            wx += val * dx
+            wy += val * dy
+        elif op == TURN:
+            a, b, c, d = ROTATIONS[val]
+            hx, hy = a * hx + b * hy, c * hx + d * hy
+            dx, dy = a * dx + b * dy, c * dx + d * dy
+        else:
+            mx, my = MOVES[op]
+            x += val * mx
+            y += val * my
+            dx += val * mx
+            dy += val * my
+    return (x, y), (wx, wy)
+
+
+# (A, b, R, c): position p' = p + A v + b, heading or waypoint v' = R v + c, 2x2 matrices as tuples
+IDENTITY = ((0, 0, 0, 0), (0, 0), (1, 0, 0, 1), (0, 0))
+
+
+def mat_mul(m, n):
+    return m[0] * n[0] + m[1] * n[2], m[0] * n[1] + m[1] * n[3], m[2] * n[0] + m[3] * n[2], m[2] * n[1] + m[3] * n[3]
+
+
+def mat_vec(m, v):
+    return m[0] * v[0] + m[1] * v[1], m[2] * v[0] + m[3] * v[1]
+
+
+def compose(t1, t2):
+    # t1 first, then t2
+    a1, b1, r1, c1 = t1
+    a2, b2, r2, c2 = t2
+    a = tuple(x + y for x, y in zip(a1, mat_mul(a2, r1)))
+    a2c1, r2c1 = mat_vec(a2, c1), mat_vec(r2, c1)
+    b = (b1[0] + a2c1[0] + b2[0], b1[1] + a2c1[1] + b2[1])
+    c = (r2c1[0] + c2[0], r2c1[1] + c2[1])
+    return a, b, mat_mul(r2, r1), c
+
+
+def command_transform(op: int, val: int, waypoint: bool):
+    zero, ident, origin = (0, 0, 0, 0), (1, 0, 0, 1), (0, 0)
+    if op == FORWARD:
+        return (val, 0, 0, val), origin, ident, origin
+    if op == TURN:
+        return zero, origin, ROTATIONS[val], origin
+    mx, my = MOVES[op]
+    move = (val * mx, val * my)
+    return (zero, origin, ident, move) if waypoint else (zero, move, ident, origin)
+
+
+class PlanIndex:
+
+    def __init__(self, plan: List[str], wp: Tuple[int, int] = None):
+        self.waypoint = wp is not None
+        self.start = wp if self.waypoint else HEADINGS[0]
+        self.n = len(plan)
+        self.size = 1
+        while self.size < self.n:
+            self.size *= 2
+        # Segment tree of composed transforms, leaves at size..size + n
+        self.tree = [IDENTITY] * (2 * self.size)
+        ops, vals = compile_plan(plan)
+        for i, (op, val) in enumerate(zip(ops, vals)):
+            self.tree[self.size + i] = command_transform(op, val, self.waypoint)
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = compose(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def update(self, i: int, cmd: str) -> None:
+        if not 0 <= i < self.n:
+            raise IndexError(f"command index {i} out of range for a plan of {self.n}")
+        i += self.size
+        self.tree[i] = command_transform(*compile_command(cmd), self.waypoint)
+        i //= 2
+        while i:
+            self.tree[i] = compose(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+    def prefix(self, k: int):
+        left, right = IDENTITY, IDENTITY
+        lo, hi = self.size, self.size + k
+        while lo < hi:
+            if lo & 1:
+                left = compose(left, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = compose(self.tree[hi], right)
+            lo //= 2
+            hi //= 2
+        return compose(left, right)
+
+    def position_after(self, k: int) -> Tuple[int, int]:
+        if not 0 <= k <= self.n:
+            raise IndexError(f"prefix length {k} out of range for a plan of {self.n}")
+        a, b, _, _ = self.prefix(k)
+        x, y = mat_vec(a, self.start)
+        return x + b[0], y + b[1]
+
+
+def part1(pos: Tuple[int, int]) -> None:
+    x, y = pos
+    print(abs(x) + abs(y))
+
+
+def part2(pos: Tuple[int, int]) -> None:
+    x, y = pos
+    print(abs(x) + abs(y))
 
 
 class Test(unittest.TestCase):
@@ -112,12 +245,50 @@ class Test(unittest.TestCase):
         self.assertEqual(-72, ship.y)
         self.assertEqual(286, ship.manhattan_dist_from_origin())
 
+    def test_compile_plan(self):
+        ops, vals = compile_plan(['F10', 'N3', 'L90', 'R90', 'R270', 'W2'])
+        self.assertEqual([FORWARD, NORTH, TURN, TURN, TURN, WEST], list(ops))
+        self.assertEqual([10, 3, 1, 3, 1, 2], list(vals))
+        self.assertRaises(ValueError, compile_plan, ['L45'])
+
+    def test_plan_index(self):
+        plan = ['F10', 'L180', 'E5', 'F3', 'R270', 'S4', 'F1', 'W2', 'L90', 'F6', 'N1', 'R180', 'F2']
+        for wp in (None, (10, 1)):
+            index = PlanIndex(plan, wp)
+            for k in range(len(plan) + 1):
+                ship = Ship(wp=Waypoint(*wp) if wp else None)
+                for cmd in plan[:k]:
+                    ship.navigate(cmd)
+                self.assertEqual((ship.x, ship.y), index.position_after(k), f"wp={wp}, k={k}")
+            index.update(1, 'R90')
+            edited = plan[:1] + ['R90'] + plan[2:]
+            ship = Ship(wp=Waypoint(*wp) if wp else None)
+            for cmd in edited:
+                ship.navigate(cmd)
+            self.assertEqual((ship.x, ship.y), index.position_after(len(plan)))
+            self.assertRaises(IndexError, index.position_after, len(plan) + 1)
+            self.assertRaises(IndexError, index.position_after, -1)
+            self.assertRaises(IndexError, index.update, len(plan), 'F1')
+
+    def test_navigate_compiled(self):
+        ship, wp_ship = navigate(*compile_plan(['F10', 'N3', 'F7', 'R90', 'F11']))
+        self.assertEqual((17, -8), ship)
+        self.assertEqual((214, -72), wp_ship)
+        plan = ['F10', 'L180', 'E5', 'F3', 'R270', 'S4', 'F1', 'W2', 'L90', 'F6', 'N1', 'R180', 'F2']
+        ship, wp_ship = navigate(*compile_plan(plan))
+        s1, s2 = Ship(), Ship(wp=Waypoint(10, 1))
+        for cmd in plan:
+            s1.navigate(cmd)
+            s2.navigate(cmd)
+        self.assertEqual(((s1.x, s1.y), (s2.x, s2.y)), (ship, wp_ship))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
         with open(sys.argv[1], 'r') as infile:
             lines = [s for s in infile.read().split('\n') if s]
-            part1(lines)
-            part2(lines)
+            ship, wp_ship = navigate(*compile_plan(lines))
+            part1(ship)
+            part2(wp_ship)
     else:
         unittest.main()
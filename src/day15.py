@@ -1,26 +1,43 @@
 import sys
 import unittest
-from typing import List
-from collections import defaultdict
+from array import array
+from typing import Iterator, List
 
 
 def elf_game(start_nums: List[int], max_turns: int) -> int:
-    hist = defaultdict(list)
-    for i, n in enumerate(start_nums):
-        hist[n].append(i + 1)
+    seen = last_seen_table(start_nums, max_turns)
+    for i, n in enumerate(start_nums[:-1]):
+        seen[n] = i + 1
     last = start_nums[-1]
-    turn = len(start_nums)
-    while turn < max_turns:
-        turn += 1
-        spoken = 0
-        age = hist[last]
-        if len(age) > 1:
-            spoken = age[-1] - age[-2]
-        hist[spoken].append(turn)
-        last = spoken
+    for turn in range(len(start_nums), max_turns):
+        prev = seen[last]
+        seen[last] = turn
+        last = turn - prev if prev else 0
     return last
 
 
+def spoken_numbers(start_nums: List[int], max_turns: int) -> Iterator[int]:
+    seen = last_seen_table(start_nums, max_turns)
+    for i, n in enumerate(start_nums):
+        if i == max_turns:
+            return
+        if i > 0:
+            seen[start_nums[i - 1]] = i
+        yield n
+    last = start_nums[-1]
+    for turn in range(len(start_nums), max_turns):
+        prev = seen[last]
+        seen[last] = turn
+        last = turn - prev if prev else 0
+        yield last
+
+
+def last_seen_table(start_nums: List[int], max_turns: int) -> array:
+    # Every spoken number is an age, hence smaller than max_turns; slot 0 means "never spoken".
+    size = max(max_turns, max(start_nums) + 1)
+    return array('I', bytes(4 * size))
+
+
 def part1() -> None:
     print(elf_game([5, 1, 9, 18, 13, 8, 0], 2020))
 
@@ -45,6 +62,11 @@ class Test(unittest.TestCase):
         for ns, t, n in test_data:
             self.assertEqual(n, elf_game(ns, t), f"({ns}, {t})")
 
+    def test_spoken_numbers(self):
+        self.assertEqual([0, 3, 6, 0, 3, 3, 1, 0, 4, 0], list(spoken_numbers([0, 3, 6], 10)))
+        self.assertEqual([0, 3], list(spoken_numbers([0, 3, 6], 2)))
+        self.assertEqual(436, list(spoken_numbers([0, 3, 6], 2020))[-1])
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
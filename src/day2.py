@@ -1,39 +1,100 @@
+import mmap
+import os
+import random
 import re
+import string
+import tempfile
 import unittest
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Tuple
 
 import sys
 
+POLICY = re.compile(r"(\d+)-(\d+)\s(\w):\s(\w+)", re.ASCII)
+POLICY_BYTES = re.compile(rb"(\d+)-(\d+)[ \t](\w):[ \t](\w+)")
+PARALLEL_MIN_SIZE = 1 << 22
+
 
 def check_passwd_old(s: str) -> bool:
-    m = re.match(r"(\d+)-(\d+)\s(\w):\s(\w+)", s, re.ASCII)
+    m = POLICY.match(s)
     lo, hi, ch, pwd = int(m[1]), int(m[2]), m[3], m[4]
-    cnt = 0
-    for c in pwd:
-        if c == ch:
-            cnt += 1
-    return lo <= cnt <= hi
+    return lo <= pwd.count(ch) <= hi
 
 
 def check_passwd_new(s: str) -> bool:
-    m = re.match(r"(\d+)-(\d+)\s(\w):\s(\w+)", s, re.ASCII)
+    m = POLICY.match(s)
     fst, snd, ch, pwd = int(m[1]) - 1, int(m[2]) - 1, m[3], m[4]
     return (pwd[fst] == ch) ^ (pwd[snd] == ch)
 
 
-def part1(entries):
-    cnt = 0
-    for p in entries:
-        if check_passwd_old(p):
-            cnt += 1
-    print(cnt)
+def count_valid(buf, start: int, end: int) -> Tuple[int, int]:
+    old, new = 0, 0
+    for m in POLICY_BYTES.finditer(buf, start, end):
+        lo, hi, ch, pwd = int(m[1]), int(m[2]), m[3], m[4]
+        if lo <= pwd.count(ch) <= hi:
+            old += 1
+        if (pwd[lo - 1:lo] == ch) != (pwd[hi - 1:hi] == ch):
+            new += 1
+    return old, new
+
+
+def scan_passwords(fname: str) -> Tuple[int, int]:
+    return scan_range(fname, 0, os.path.getsize(fname))
+
+
+def scan_range(fname: str, start: int, end: int) -> Tuple[int, int]:
+    if start >= end:
+        return 0, 0
+    with open(fname, 'rb') as infile:
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return count_valid(mm, start, end)
+
+
+def chunk_bounds(buf, size: int, parts: int) -> List[Tuple[int, int]]:
+    # Ranges end right after a newline so no entry is split between workers.
+    bounds, start = [], 0
+    for i in range(1, parts + 1):
+        end = size
+        if i < parts:
+            nl = buf.find(b'\n', max(start, i * size // parts))
+            end = size if nl == -1 else nl + 1
+        if end > start:
+            bounds.append((start, end))
+            start = end
+    return bounds
+
 
+def scan_passwords_parallel(fname: str, workers: int = None, min_size: int = PARALLEL_MIN_SIZE) -> Tuple[int, int]:
+    size = os.path.getsize(fname)
+    workers = workers or os.cpu_count()
+    if size < min_size or workers == 1:
+        return scan_passwords(fname)
+    with open(fname, 'rb') as infile:
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = chunk_bounds(mm, size, workers)
+    starts, ends = zip(*bounds)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        counts = list(pool.map(scan_range, repeat(fname), starts, ends))
+    return sum(c[0] for c in counts), sum(c[1] for c in counts)
 
-def part2(entries):
-    cnt = 0
-    for p in entries:
-        if check_passwd_new(p):
-            cnt += 1
-    print(cnt)
+
+def gen_input(entries: int) -> str:
+    lines = []
+    for _ in range(entries):
+        lo = random.randint(1, 10)
+        hi = random.randint(lo + 1, 20)
+        pwd = ''.join(random.choice(string.ascii_lowercase[:5]) for _ in range(random.randint(hi, 30)))
+        lines.append(f"{lo}-{hi} {random.choice(pwd)}: {pwd}")
+    return '\n'.join(lines)
+
+
+def part1(counts: Tuple[int, int]):
+    print(counts[0])
+
+
+def part2(counts: Tuple[int, int]):
+    print(counts[1])
 
 
 class Test(unittest.TestCase):
@@ -55,12 +116,31 @@ class Test(unittest.TestCase):
         for p, v in data:
             self.assertEqual(v, check_passwd_new(p))
 
+    def test_count_valid(self):
+        data = b"1-3 a: abcde\n1-3 b: cdefg\n2-9 c: ccccccccc\n"
+        self.assertEqual((2, 1), count_valid(data, 0, len(data)))
+        self.assertEqual((1, 0), count_valid(data, 26, len(data)))
+
+    def test_chunk_bounds(self):
+        data = b"1-3 a: abcde\n1-3 b: cdefg\n2-9 c: ccccccccc\n"
+        self.assertEqual([(0, 26), (26, 43)], chunk_bounds(data, len(data), 3))
+        self.assertEqual([(0, 26), (26, 43)], chunk_bounds(data, len(data), 2))
+        self.assertEqual([(0, 13), (13, 26), (26, 43)], chunk_bounds(data, len(data), 10))
+        self.assertEqual([(0, 43)], chunk_bounds(data, len(data), 1))
+
+    def test_scan_passwords_parallel(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt') as tmp:
+            tmp.write(gen_input(2000))
+            tmp.flush()
+            expected = scan_passwords(tmp.name)
+            self.assertEqual(expected, scan_passwords_parallel(tmp.name, workers=3, min_size=0))
+            self.assertEqual(expected, scan_passwords_parallel(tmp.name))
+
 
 if __name__ == "__main__":
     if len(sys.argv) == 2:
-        with open(sys.argv[1], "r") as infile:
-            lines = infile.readlines()
-            part1(lines)
-            part2(lines)
+        counts = scan_passwords_parallel(sys.argv[1])
+        part1(counts)
+        part2(counts)
     else:
         unittest.main()
@@ -1,37 +1,39 @@
+import heapq
 import sys
 import unittest
+from array import array
+from typing import List, Set
 
 
-def crab_game_small(cups: str, rounds: int) -> str:
-    cl = CircularList()
-    for n in (int(ch) for ch in cups):
-        cl.add(n)
-    while rounds > 0:
-        picks = cl.after(cl.head, 3)
-        for n in picks:
-            cl.remove(n)
-        dest = cl.head - 1
-        while dest not in cl:
-            if dest < cl.min_item:
-                dest = cl.max_item
-                break
-            dest -= 1
-        start = dest
-        for n in picks:
-            cl.insert(start, n)
-            start = n
-        cl.move_head()
-        rounds -= 1
-    cups = cl.after(1, len(cups) - 1)
+def crab_game_small(cups: str, rounds: int, engine: str = 'array') -> str:
+    game = play([int(ch) for ch in cups], rounds, engine)
+    cups = game.after(1, len(cups) - 1)
     return ''.join(str(n) for n in cups)
 
 
-def crab_game_big(cups: str, rounds: int, max_val: int) -> int:
-    cl = CircularList()
-    for n in (int(ch) for ch in cups):
-        cl.add(n)
-    for n in range(cl.max_item + 1, max_val + 1):
-        cl.add(n)
+def crab_game_big(cups: str, rounds: int, max_val: int, engine: str = 'array') -> int:
+    labels = [int(ch) for ch in cups]
+    labels.extend(range(max(labels) + 1, max_val + 1))
+    game = play(labels, rounds, engine)
+    cups = game.after(1, 2)
+    return cups[0] * cups[1]
+
+
+def play(labels: List[int], rounds: int, engine: str):
+    if engine == 'array':
+        table = SuccessorTable(labels)
+        table.play(rounds)
+        return table
+    if engine == 'list':
+        cl = CircularList()
+        for n in labels:
+            cl.add(n)
+        play_list(cl, rounds)
+        return cl
+    raise ValueError(f"unknown engine: {engine}")
+
+
+def play_list(cl: 'CircularList', rounds: int) -> None:
     while rounds > 0:
         picks = cl.after(cl.head, 3)
         for n in picks:
@@ -48,8 +50,42 @@ def crab_game_big(cups: str, rounds: int, max_val: int) -> int:
             start = n
         cl.move_head()
         rounds -= 1
-    cups = cl.after(1, 2)
-    return cups[0] * cups[1]
+
+
+class SuccessorTable:
+
+    def __init__(self, labels: List[int]):
+        if min(labels) != 1 or max(labels) != len(labels) or len(set(labels)) != len(labels):
+            raise ValueError("cup labels must be a permutation of 1..n")
+        # nxt[label] is the label of the next cup clockwise
+        self.nxt = array('I', bytes(4 * (len(labels) + 1)))
+        for a, b in zip(labels, labels[1:]):
+            self.nxt[a] = b
+        self.nxt[labels[-1]] = labels[0]
+        self.head = labels[0]
+        self.max_item = len(labels)
+
+    def play(self, rounds: int) -> None:
+        nxt, crt, top = self.nxt, self.head, self.max_item
+        for _ in range(rounds):
+            a = nxt[crt]
+            b = nxt[a]
+            c = nxt[b]
+            dest = crt - 1 or top
+            while dest == a or dest == b or dest == c:
+                dest = dest - 1 or top
+            nxt[crt] = nxt[c]
+            nxt[c] = nxt[dest]
+            nxt[dest] = a
+            crt = nxt[crt]
+        self.head = crt
+
+    def after(self, start: int, how_many: int) -> List[int]:
+        result = []
+        for i in range(how_many):
+            start = self.nxt[start]
+            result.append(start)
+        return result
 
 
 class Link:
@@ -67,6 +103,9 @@ class CircularList:
         self.tail = None
         self.min_item = sys.maxsize
         self.max_item = -sys.maxsize
+        # Lazy heaps: removed items are dropped once they surface (the max heap is negated).
+        self.min_heap, self.max_heap = [], []
+        self.min_evicted, self.max_evicted = set(), set()
 
     def add(self, item: int):
         if not self.head:
@@ -78,6 +117,8 @@ class CircularList:
             self.nodes[self.tail].nxt = item
             self.tail = item
             self.nodes[self.head].pre = item
+        heapq.heappush(self.min_heap, item)
+        heapq.heappush(self.max_heap, -item)
         self.min_item = min(item, self.min_item)
         self.max_item = max(item, self.max_item)
 
@@ -93,9 +134,14 @@ class CircularList:
         if item == self.tail:
             self.tail = crt.nxt
         if item == self.min_item:
-            self.min_item = min(self.nodes.keys())
+            self.min_item = self._next_live(self.min_heap, self.min_evicted, 1, sys.maxsize)
         if item == self.max_item:
-            self.max_item = max(self.nodes.keys())
+            self.max_item = self._next_live(self.max_heap, self.max_evicted, -1, -sys.maxsize)
+
+    def _next_live(self, heap: List[int], evicted: Set[int], sign: int, default: int) -> int:
+        while heap and sign * heap[0] not in self.nodes:
+            evicted.add(sign * heapq.heappop(heap))
+        return sign * heap[0] if heap else default
 
     def after(self, start: int, how_many: int) -> list[int]:
         result = []
@@ -113,6 +159,12 @@ class CircularList:
         new.pre = start
         crt.nxt = item
         nxt.pre = item
+        if item in self.min_evicted:
+            self.min_evicted.discard(item)
+            heapq.heappush(self.min_heap, item)
+        if item in self.max_evicted:
+            self.max_evicted.discard(item)
+            heapq.heappush(self.max_heap, -item)
         self.min_item = min(item, self.min_item)
         self.max_item = max(item, self.max_item)
 
@@ -134,8 +186,37 @@ def part2() -> None:
 class Test(unittest.TestCase):
 
     def test_crab_game_small(self):
-        self.assertEqual('92658374', crab_game_small('389125467', 10))
-        self.assertEqual('67384529', crab_game_small('389125467', 100))
+        for engine in ('array', 'list'):
+            self.assertEqual('92658374', crab_game_small('389125467', 10, engine))
+            self.assertEqual('67384529', crab_game_small('389125467', 100, engine))
+
+    def test_engines_agree(self):
+        for rounds in (0, 1, 7, 1000):
+            self.assertEqual(crab_game_big('389125467', rounds, 50, 'list'),
+                             crab_game_big('389125467', rounds, 50, 'array'))
+
+    def test_circular_list_min_max(self):
+        cl = CircularList()
+        for n in (5, 1, 9, 3, 7):
+            cl.add(n)
+        cl.remove(9)
+        cl.remove(7)
+        self.assertEqual((1, 5), (cl.min_item, cl.max_item))
+        cl.insert(3, 9)
+        self.assertEqual(9, cl.max_item)
+        cl.remove(1)
+        cl.remove(3)
+        self.assertEqual((5, 9), (cl.min_item, cl.max_item))
+        cl.insert(5, 1)
+        cl.remove(9)
+        self.assertEqual((1, 5), (cl.min_item, cl.max_item))
+        for n in (1, 5):
+            cl.remove(n)
+        self.assertEqual((sys.maxsize, -sys.maxsize), (cl.min_item, cl.max_item))
+
+    def test_successor_table_labels(self):
+        self.assertRaises(ValueError, SuccessorTable, [2, 3, 4])
+        self.assertRaises(ValueError, SuccessorTable, [1, 1, 3])
 
     def test_crab_game_big(self):
         self.assertEqual(149245887792, crab_game_big('389125467', 10_000_000, 1_000_000))
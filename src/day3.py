@@ -1,5 +1,10 @@
+import heapq
+import random
 import unittest
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import gcd
+from typing import List, Tuple
 
 import sys
 
@@ -18,21 +23,93 @@ def parse_grid(s: str) -> List[List[str]]:
     return [list(r) for r in s.split('\n') if r]
 
 
-def part1(grid):
-    print(count_trees(grid, 3, 1))
+class PackedGrid:
+    # The map as one flat bytes object, 1 for a tree and 0 for open ground
+    TREES = bytes.maketrans(b'.#', b'\x00\x01')
 
+    def __init__(self, s: str):
+        rows = [r for r in s.split('\n') if r]
+        self.h = len(rows)
+        self.w = len(rows[0]) if rows else 0
+        self.cells = ''.join(rows).encode('ascii').translate(self.TREES)
 
-def part2(grid):
+
+def count_trees_packed(grid: PackedGrid, right: int, down: int) -> int:
+    return count_strided(grid.cells, grid.w, right, down)
+
+
+def count_strided(cells: bytes, w: int, right: int, down: int) -> int:
+    # Steps t, t + period, t + 2 * period, ... land on evenly spaced cells: one strided slice.
+    period = w // gcd(right, w)
+    stride = period * down * w
+    cnt = 0
+    for t in range(period):
+        cnt += cells[t * down * w + (t * right) % w::stride].count(1)
+    return cnt
+
+
+def count_trees_many(grid: PackedGrid, slopes: List[Tuple[int, int]]) -> List[int]:
+    return [count_trees_packed(grid, right, down) for right, down in slopes]
+
+
+def gen_input(rows: int, width: int = 31) -> str:
+    return '\n'.join(''.join(random.choice('..#') for _ in range(width)) for _ in range(rows))
+
+
+def sweep_rights(grid: PackedGrid, max_right: int, down: int) -> List[int]:
+    # Rows visited with this down are copied once; rights equal modulo the width share a count.
+    w = grid.w
+    rows = b''.join(grid.cells[r * w:(r + 1) * w] for r in range(0, grid.h, down))
+    by_col = {}
+    counts = []
+    for right in range(1, max_right + 1):
+        col = right % w
+        if col not in by_col:
+            by_col[col] = count_strided(rows, w, col, 1)
+        counts.append(by_col[col])
+    return counts
+
+
+_shared_grid = None
+
+
+def _share_grid(grid: PackedGrid) -> None:
+    global _shared_grid
+    _shared_grid = grid
+
+
+def _sweep_shared(max_right: int, down: int) -> List[int]:
+    return sweep_rights(_shared_grid, max_right, down)
+
+
+def rank_slopes(grid: PackedGrid, max_right: int, max_down: int, top: int = 10,
+                fewest: bool = False, workers: int = 1) -> List[Tuple[Tuple[int, int], int]]:
+    downs = range(1, max_down + 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_share_grid, initargs=(grid,)) as pool:
+            sweeps = list(pool.map(_sweep_shared, repeat(max_right), downs))
+    else:
+        sweeps = [sweep_rights(grid, max_right, down) for down in downs]
+    slopes = (((right, down), cnt) for down, counts in zip(downs, sweeps) for right, cnt in enumerate(counts, 1))
+    pick = heapq.nsmallest if fewest else heapq.nlargest
+    return pick(top, slopes, key=lambda e: e[1])
+
+
+def part1(grid: PackedGrid):
+    print(count_trees_packed(grid, 3, 1))
+
+
+def part2(grid: PackedGrid):
     p = 1
-    for right, down in [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]:
-        p *= count_trees(grid, right, down)
+    for cnt in count_trees_many(grid, [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]):
+        p *= cnt
     print(p)
 
 
 class Test(unittest.TestCase):
 
-    def test_count_trees(self):
-        grid = parse_grid("""..##.......
+    def setUp(self) -> None:
+        self.input = """..##.......
 #...#...#..
 .#....#..#.
 ..#.#...#.#
@@ -42,16 +119,43 @@ class Test(unittest.TestCase):
 .#........#
 #.##...#...
 #...##....#
-.#..#...#.#""")
+.#..#...#.#"""
+
+    def test_count_trees(self):
+        grid = parse_grid(self.input)
         data = [(1, 1, 2), (3, 1, 7), (5, 1, 3), (7, 1, 4), (1, 2, 2)]
         for r, d, t in data:
             self.assertEqual(t, count_trees(grid, r, d))
 
+    def test_count_trees_many(self):
+        grid = PackedGrid(self.input)
+        self.assertEqual((11, 11), (grid.w, grid.h))
+        self.assertEqual([2, 7, 3, 4, 2], count_trees_many(grid, [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]))
+
+    def test_rank_slopes(self):
+        text = gen_input(100, 7)
+        grid, packed = parse_grid(text), PackedGrid(text)
+        counts = {(r, d): count_trees(grid, r, d) for r in range(1, 16) for d in range(1, 5)}
+        best = rank_slopes(packed, 15, 4, top=5)
+        self.assertEqual(sorted(counts.values(), reverse=True)[:5], [cnt for _, cnt in best])
+        for slope, cnt in best:
+            self.assertEqual(counts[slope], cnt)
+        worst = rank_slopes(packed, 15, 4, top=3, fewest=True, workers=2)
+        self.assertEqual(sorted(counts.values())[:3], [cnt for _, cnt in worst])
+        self.assertEqual([((3, 1), 7)], rank_slopes(PackedGrid(self.input), 3, 1, top=1))
+
+    def test_count_trees_packed(self):
+        text = gen_input(200, 12)
+        grid, packed = parse_grid(text), PackedGrid(text)
+        for right in range(0, 30):
+            for down in range(1, 6):
+                self.assertEqual(count_trees(grid, right, down), count_trees_packed(packed, right, down))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
         with open(sys.argv[1], 'r') as infile:
-            g = parse_grid(infile.read())
+            g = PackedGrid(infile.read())
             part1(g)
             part2(g)
     else:
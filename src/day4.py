@@ -1,17 +1,30 @@
 import re
 import unittest
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import sys
 
+from records import read_record_file, read_records
+
 FIELDS = {'byr', 'iyr', 'eyr', 'hgt', 'hcl', 'ecl', 'pid', 'cid'}
 
+FIELD = re.compile(r"(\w+):([a-zA-Z0-9#]+)")
+
 
 def parse_passports(s: str) -> List[Dict[str, str]]:
-    res = []
-    for p in re.split(r"(?m)^\s*$\s*", s):
-        res.append(dict(re.findall(r"(\w+):([a-zA-Z0-9#]+)", p)))
-    return res
+    return [parse_passport(r) for r in read_records(s.split('\n'))]
+
+
+def read_passports(fname: str) -> Iterator[Dict[str, str]]:
+    for r in read_record_file(fname):
+        yield parse_passport(r)
+
+
+def parse_passport(lines: List[str]) -> Dict[str, str]:
+    passport = {}
+    for line in lines:
+        passport.update(FIELD.findall(line))
+    return passport
 
 
 def has_req_fields(passport: Dict[str, str]) -> bool:
@@ -19,67 +32,90 @@ def has_req_fields(passport: Dict[str, str]) -> bool:
     return (not diff) or (diff == {'cid'})
 
 
-def has_valid_fields(passport: Dict[str, str]):
-    if not is_int_in_range(passport.get('byr'), 4, 1920, 2002):
-        return False
-    if not is_int_in_range(passport.get('iyr'), 4, 2010, 2020):
-        return False
-    if not is_int_in_range(passport.get('eyr'), 4, 2020, 2030):
-        return False
-    if not is_valid_hgt(passport.get('hgt')):
-        return False
-    if not is_valid_hcl(passport.get('hcl')):
-        return False
-    if not is_valid_ecl(passport.get('ecl')):
-        return False
-    if not is_valid_pid(passport.get('pid')):
-        return False
-    return True
+EYE_COLORS = frozenset({'amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth'})
+
+# field -> (kind, *spec), compiled once by compile_rule below
+RULES = (
+    ('byr', ('digits', 4, 1920, 2002)),
+    ('iyr', ('digits', 4, 2010, 2020)),
+    ('eyr', ('digits', 4, 2020, 2030)),
+    ('hgt', ('units', {'cm': (150, 193), 'in': (59, 76)})),
+    ('hcl', ('pattern', '#[0-9a-f]{6}')),
+    ('ecl', ('one_of', EYE_COLORS)),
+    ('pid', ('pattern', r'\d{9}')),
+)
 
 
 def is_int_in_range(s: str, length: int, min_val: int, max_val: int) -> bool:
-    if not s:
-        return False
-    p = "^\\d{" + str(length) + "}$"
-    m = re.match(p, s)
-    if m:
-        n = int(m.group())
-        return min_val <= n <= max_val
-    return False
+    return bool(s) and len(s) == length and s.isdecimal() and min_val <= int(s) <= max_val
+
+
+def compile_rule(kind: str, *spec) -> Callable[[str], bool]:
+    if kind == 'digits':
+        length, min_val, max_val = spec
+        return lambda s: is_int_in_range(s, length, min_val, max_val)
+    if kind == 'units':
+        ranges, = spec
+        pattern = re.compile(r'(\d{2,3})(' + '|'.join(re.escape(u) for u in ranges) + ')')
+
+        def check_units(s: str) -> bool:
+            m = pattern.fullmatch(s)
+            if not m:
+                return False
+            lo, hi = ranges[m[2]]
+            return lo <= int(m[1]) <= hi
+
+        return check_units
+    if kind == 'pattern':
+        pattern = re.compile(spec[0])
+        return lambda s: pattern.fullmatch(s) is not None
+    if kind == 'one_of':
+        values = frozenset(spec[0])
+        return values.__contains__
+    raise ValueError(f"unknown rule kind: {kind}")
+
+
+CHECKS = {field: compile_rule(*rule) for field, rule in RULES}
+
+
+def compile_validator(checks: Dict[str, Callable[[str], bool]] = CHECKS
+                      ) -> Callable[[Dict[str, str]], Optional[str]]:
+    checks = tuple(checks.items())
+
+    def first_invalid_field(passport: Dict[str, str]) -> Optional[str]:
+        for field, check in checks:
+            value = passport.get(field)
+            if not value or not check(value):
+                return field
+        return None
+
+    return first_invalid_field
+
+
+first_invalid_field = compile_validator()
+
+
+def has_valid_fields(passport: Dict[str, str]) -> bool:
+    return first_invalid_field(passport) is None
 
 
 def is_valid_hgt(s: str) -> bool:
-    if not s:
-        return False
-    m = re.match("^(\\d{2,3})(in|cm)$", s)
-    if m:
-        h = int(m.group(1))
-        u = m.group(2)
-        if u == "in":
-            return 59 <= h <= 76
-        if u == "cm":
-            return 150 <= h <= 193
-    return False
+    return bool(s) and CHECKS['hgt'](s)
 
 
 def is_valid_hcl(s: str) -> bool:
-    if not s:
-        return False
-    m = re.match("^#[0-9a-f]{6}$", s)
-    return bool(m)
+    return bool(s) and CHECKS['hcl'](s)
 
 
 def is_valid_pid(s: str) -> bool:
-    if not s:
-        return False
-    return bool(re.match("^\\d{9}$", s))
+    return bool(s) and CHECKS['pid'](s)
 
 
 def is_valid_ecl(s: str) -> bool:
-    return s in {'amb', 'blu', 'brn', 'gry', 'grn', 'hzl', 'oth'}
+    return CHECKS['ecl'](s)
 
 
-def part1(passports: List[Dict[str, str]]) -> None:
+def part1(passports: Iterable[Dict[str, str]]) -> None:
     cnt = 0
     for p in passports:
         if has_req_fields(p):
@@ -87,7 +123,7 @@ def part1(passports: List[Dict[str, str]]) -> None:
     print(cnt)
 
 
-def part2(passports: List[Dict[str, str]]) -> None:
+def part2(passports: Iterable[Dict[str, str]]) -> None:
     cnt = 0
     for p in passports:
         if has_valid_fields(p):
@@ -134,6 +170,7 @@ class Test(unittest.TestCase):
         self.assertTrue(is_int_in_range('2002', 4, 1920, 2002))
         self.assertFalse(is_int_in_range('2003', 4, 1920, 2002))
         self.assertFalse(is_int_in_range('', 2, 12, 99))
+        self.assertFalse(is_int_in_range(None, 4, 1920, 2002))
 
     def test_is_valid_hgt(self):
         self.assertTrue(is_valid_hgt('60in'))
@@ -192,12 +229,21 @@ iyr:2010 hgt:158cm hcl:#b6652a ecl:blu byr:1944 eyr:2021 pid:093154719"""
         for p in passports:
             self.assertTrue(has_valid_fields(p), f'failed for {p}')
 
+    def test_first_invalid_field(self):
+        p = {'byr': '1980', 'iyr': '2012', 'eyr': '2030', 'hgt': '74in',
+             'hcl': '#623a2f', 'ecl': 'grn', 'pid': '087499704'}
+        self.assertIsNone(first_invalid_field(p))
+        self.assertEqual('hgt', first_invalid_field({**p, 'hgt': '74cm'}))
+        self.assertEqual('pid', first_invalid_field({**p, 'pid': '87499704'}))
+        self.assertEqual('byr', first_invalid_field({}))
+        only_ecl = compile_validator({'ecl': compile_rule('one_of', {'grn'})})
+        self.assertIsNone(only_ecl(p))
+        self.assertEqual('ecl', only_ecl({'ecl': 'blu'}))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
-        with open(sys.argv[1], 'r') as infile:
-            entries = parse_passports(infile.read())
-            part1(entries)
-            part2(entries)
+        part1(read_passports(sys.argv[1]))
+        part2(read_passports(sys.argv[1]))
     else:
         unittest.main()
@@ -1,46 +1,33 @@
 import sys
 import unittest
 
-from typing import Iterable
+from typing import List, Optional
+
+
+SEAT_BITS = str.maketrans('FBLR', '0101')
 
 
 def seat_id(ticket: str) -> int:
-    lo, hi = 0, 127
-    for i in range(7):
-        mid = (lo + hi) // 2
-        if ticket[i] == 'F':
-            hi = mid
-        else:
-            lo = mid + 1
-    row = lo
-    lo, hi = 0, 7
-    for i in range(7, len(ticket)):
-        mid = (lo + hi) // 2
-        if ticket[i] == 'L':
-            hi = mid
-        else:
-            lo = mid + 1
-    col = lo
-    return row * 8 + col
-
-
-def part1(tickets: Iterable[str]) -> None:
-    best = -1
-    for s in tickets:
-        sid = seat_id(s)
-        best = max(best, sid)
-    print(best)
-
-
-def part2(tickets: Iterable[str]) -> None:
-    seats = [seat_id(s) for s in tickets]
-    seats.sort()
-    for i in range(len(seats) - 1):
-        crt = seats[i]
-        nxt = seats[i + 1]
-        if nxt - crt == 2:
-            print(crt + 1)
-            break
+    # Row and column are binary numbers with F/L as 0 and B/R as 1; row * 8 + col is all ten bits.
+    return int(ticket.translate(SEAT_BITS), 2)
+
+
+def seat_ids(s: str) -> List[int]:
+    return [int(t, 2) for t in s.translate(SEAT_BITS).split()]
+
+
+def find_missing(seats: List[int]) -> Optional[int]:
+    lo, hi = min(seats), max(seats)
+    missing = (lo + hi) * (hi - lo + 1) // 2 - sum(seats)
+    return missing if lo < missing < hi else None
+
+
+def part1(seats: List[int]) -> None:
+    print(max(seats))
+
+
+def part2(seats: List[int]) -> None:
+    print(find_missing(seats))
 
 
 class Test(unittest.TestCase):
@@ -52,13 +39,18 @@ class Test(unittest.TestCase):
                 ('BBFFBBFRLL', 820)]
         for s, sid in data:
             self.assertEqual(sid, seat_id(s), f"failed for: {s}")
+        self.assertEqual([sid for _, sid in data], seat_ids('\n'.join(s for s, _ in data) + '\n'))
+
+    def test_find_missing(self):
+        self.assertEqual(12, find_missing([13, 10, 11, 14]))
+        self.assertIsNone(find_missing([10, 11, 12]))
 
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
         with open(sys.argv[1], 'r') as infile:
-            entries = infile.read().split()
-            part1(entries)
-            part2(entries)
+            ids = seat_ids(infile.read())
+            part1(ids)
+            part2(ids)
     else:
         unittest.main()
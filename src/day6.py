@@ -1,41 +1,66 @@
 import re
 import sys
 import unittest
-from collections import Counter
-from typing import List
+from typing import Iterable, Iterator, List, Tuple
+
+from records import read_record_file, read_records
+
+ANSWERS = re.compile("[a-z]+")
 
 
 def parse_answers(s: str) -> List[List[str]]:
-    ans = []
-    for p in re.split(r"(?m)^\s*$\s*", s):
-        ans.append(re.findall("[a-z]+", p))
-    return ans
+    return [parse_group(r) for r in read_records(s.split('\n'))]
 
 
-def count_one_yes(ans: List[List[str]]) -> int:
-    cnt = 0
-    for g in ans:
-        qs = {a for p in g for a in p}
-        cnt += len(qs)
-    return cnt
+def read_answers(fname: str) -> Iterator[List[str]]:
+    for r in read_record_file(fname):
+        yield parse_group(r)
+
+
+def parse_group(lines: List[str]) -> List[str]:
+    return [a for line in lines for a in ANSWERS.findall(line)]
+
+
+BITS = {chr(ord('a') + i): 1 << i for i in range(26)}
+
 
+def answer_mask(person: str) -> int:
+    mask = 0
+    for ch in person:
+        mask |= BITS[ch]
+    return mask
 
-def count_all_yes(ans: List[List[str]]):
-    cnt = 0
+
+def count_yes(ans: Iterable[List[str]]) -> Tuple[int, int]:
+    # Each person is a 26-bit mask: OR them for anyone, AND them for everyone.
+    anyone, everyone = 0, 0
     for g in ans:
-        qs = Counter([a for p in g for a in p])
-        for k in qs:
-            if qs[k] == len(g):
-                cnt += 1
-    return cnt
+        if not g:
+            continue
+        union = common = answer_mask(g[0])
+        for p in g[1:]:
+            mask = answer_mask(p)
+            union |= mask
+            common &= mask
+        anyone += union.bit_count()
+        everyone += common.bit_count()
+    return anyone, everyone
+
+
+def count_one_yes(ans: Iterable[List[str]]) -> int:
+    return count_yes(ans)[0]
+
 
+def count_all_yes(ans: Iterable[List[str]]) -> int:
+    return count_yes(ans)[1]
 
-def part1(ans: List[List[str]]) -> None:
-    print(count_one_yes(ans))
 
+def part1(counts: Tuple[int, int]) -> None:
+    print(counts[0])
 
-def part2(ans: List[List[str]]) -> None:
-    print(count_all_yes(ans))
+
+def part2(counts: Tuple[int, int]) -> None:
+    print(counts[1])
 
 
 class Test(unittest.TestCase):
@@ -70,12 +95,19 @@ b"""
     def test_count_all_yes(self):
         self.assertEqual(6, count_all_yes(parse_answers(self.input)))
 
+    def test_count_yes(self):
+        self.assertEqual((11, 6), count_yes(parse_answers(self.input)))
+        self.assertEqual((0, 0), count_yes([[]]))
+
+    def test_answer_mask(self):
+        self.assertEqual(0b101, answer_mask('ca'))
+        self.assertEqual(1 << 25, answer_mask('z'))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
-        with open(sys.argv[1], 'r') as infile:
-            answers = parse_answers(infile.read())
-            part1(answers)
-            part2(answers)
+        counts = count_yes(read_answers(sys.argv[1]))
+        part1(counts)
+        part2(counts)
     else:
         unittest.main()
@@ -1,7 +1,7 @@
 import re
 import unittest
-from collections import defaultdict, deque
-from typing import Dict, Tuple, List
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
 
 import sys
 
@@ -12,6 +12,8 @@ def parse_rules(s: str, color_to_parent) -> Dict[str, List[Tuple[str, int]]]:
         m = re.match(r'^(\w+ \w+)', r)
         if m:
             parent_color = m[0]
+            if not color_to_parent:
+                rules.setdefault(parent_color, [])  # keep "contain no other bags" heads
             for cnt, color in re.findall(r'(\d+) (\w+ \w+)', r):
                 if color_to_parent:
                     rules[color].append((parent_color, int(cnt)))
@@ -20,33 +22,110 @@ def parse_rules(s: str, color_to_parent) -> Dict[str, List[Tuple[str, int]]]:
     return rules
 
 
-def part1(s: str) -> int:
-    rules = parse_rules(s, color_to_parent=True)
-    stack, visited, total = [], set(), 0
-    for parent, _ in rules['shiny gold']:
-        stack.append(parent)
-    while stack:
-        parent = stack.pop()
-        if parent not in visited:
-            visited.add(parent)
-            total += 1
-            for grand_parent, _ in rules[parent]:
-                if grand_parent not in visited:
-                    stack.append(grand_parent)
-    return total
-
-
-def part2(s: str) -> int:
-    rules = parse_rules(s, color_to_parent=False)
-    queue, total = deque([]), 0
-    for child, count in rules['shiny gold']:
-        queue.append((child, count))
-    while queue:
-        child, count = queue.popleft()
-        total += count
-        for grand_child, grand_child_count in rules[child]:
-            queue.append((grand_child, count * grand_child_count))
-    return total
+class BagGraph:
+
+    def __init__(self, rules: Dict[str, List[Tuple[str, int]]]):
+        self.ids: Dict[str, int] = {}
+        self.children: List[List[Tuple[int, int]]] = []
+        self.child_ids: List[List[int]] = []
+        self.parents: List[List[int]] = []
+        for parent, contents in rules.items():
+            p = self.intern(parent)
+            for color, cnt in contents:
+                c = self.intern(color)
+                self.children[p].append((c, cnt))
+                self.child_ids[p].append(c)
+                self.parents[c].append(p)
+        # Memoized per color id: ancestor sets as int bitsets and nested bag totals
+        self.ancestors: List[Optional[int]] = [None] * len(self.ids)
+        self.totals: List[Optional[int]] = [None] * len(self.ids)
+
+    @classmethod
+    def parse(cls, s: str) -> 'BagGraph':
+        return cls(parse_rules(s, color_to_parent=False))
+
+    def intern(self, color: str) -> int:
+        i = self.ids.get(color)
+        if i is None:
+            i = self.ids[color] = len(self.ids)
+            self.children.append([])
+            self.child_ids.append([])
+            self.parents.append([])
+        return i
+
+    def count_containers(self, color: str) -> int:
+        if color not in self.ids:
+            return 0
+        i = self.ids[color]
+        return self.evaluate(i, self.parents, self.ancestors, self.ancestor_set).bit_count()
+
+    def count_contents(self, color: str) -> int:
+        if color not in self.ids:
+            return 0
+        i = self.ids[color]
+        return self.evaluate(i, self.child_ids, self.totals, self.total)
+
+    def evaluate_all(self) -> None:
+        # Kahn's order: ancestors are filled walking it forwards, totals walking it backwards.
+        n = len(self.ids)
+        indegree = [len(ps) for ps in self.parents]
+        order = [i for i in range(n) if not indegree[i]]
+        for i in order:
+            for c in self.child_ids[i]:
+                indegree[c] -= 1
+                if not indegree[c]:
+                    order.append(c)
+        if len(order) < n:
+            raise ValueError("bag rules contain a cycle")
+        for i in order:
+            self.ancestors[i] = self.ancestor_set(i)
+        for i in reversed(order):
+            self.totals[i] = self.total(i)
+
+    def ancestor_set(self, i: int) -> int:
+        bits = 0
+        for p in self.parents[i]:
+            bits |= (1 << p) | self.ancestors[p]
+        return bits
+
+    def total(self, i: int) -> int:
+        return sum(cnt * (1 + self.totals[c]) for c, cnt in self.children[i])
+
+    @staticmethod
+    def evaluate(start: int, edges: List[List[int]], memo: List[Optional[int]],
+                 combine: Callable[[int], int]) -> int:
+        # Post-order walk; reaching a node still in `visiting` again means a cycle.
+        stack, visiting = [start], set()
+        while stack:
+            i = stack[-1]
+            if memo[i] is not None:
+                stack.pop()
+                continue
+            pending = [j for j in edges[i] if memo[j] is None]
+            if pending:
+                if i in visiting or not visiting.isdisjoint(pending):
+                    raise ValueError("bag rules contain a cycle")
+                visiting.add(i)
+                stack.extend(pending)
+            else:
+                memo[i] = combine(i)
+                visiting.discard(i)
+                stack.pop()
+        return memo[start]
+
+
+def containment_table(rules: Dict[str, List[Tuple[str, int]]]) -> Dict[str, Tuple[int, int]]:
+    graph = BagGraph(rules)
+    graph.evaluate_all()
+    return {color: (graph.ancestors[i].bit_count(), graph.totals[i]) for color, i in graph.ids.items()}
+
+
+def part1(graph: BagGraph) -> int:
+    return graph.count_containers('shiny gold')
+
+
+def part2(graph: BagGraph) -> int:
+    return graph.count_contents('shiny gold')
 
 
 class Test(unittest.TestCase):
@@ -75,18 +154,45 @@ dark violet bags contain no other bags."""
         self.assertEqual([('light red', 2), ('dark orange', 4)], rs['muted yellow'])
 
     def test_part1(self):
-        self.assertEqual(4, part1(self.input1))
+        self.assertEqual(4, part1(BagGraph.parse(self.input1)))
 
     def test_part2(self):
-        self.assertEqual(32, part2(self.input1))
-        self.assertEqual(126, part2(self.input2))
+        self.assertEqual(32, part2(BagGraph.parse(self.input1)))
+        self.assertEqual(126, part2(BagGraph.parse(self.input2)))
+
+    def test_bag_graph(self):
+        g = BagGraph.parse(self.input1)
+        self.assertEqual(9, len(g.ids))
+        self.assertEqual(0, g.count_containers('light red'))
+        self.assertEqual(2, g.count_containers('bright white'))
+        self.assertEqual(7, g.count_containers('faded blue'))
+        self.assertEqual(0, g.count_contents('faded blue'))
+        self.assertEqual(7, g.count_contents('dark olive'))
+        self.assertEqual(32, g.count_contents('shiny gold'))
+        self.assertEqual(0, g.count_contents('no such'))
+
+    def test_containment_table(self):
+        table = containment_table(parse_rules(self.input1, color_to_parent=False))
+        g = BagGraph.parse(self.input1)
+        self.assertEqual({c: (g.count_containers(c), g.count_contents(c)) for c in g.ids}, table)
+        self.assertEqual((4, 32), table['shiny gold'])
+        self.assertEqual((0, 126), containment_table(parse_rules(self.input2, color_to_parent=False))['shiny gold'])
+        lonely = containment_table(parse_rules("a b bags contain no other bags.", color_to_parent=False))
+        self.assertEqual({'a b': (0, 0)}, lonely)
+        cyclic = parse_rules("a b bags contain 1 c d bag.\nc d bags contain 2 a b bags.", color_to_parent=False)
+        self.assertRaises(ValueError, containment_table, cyclic)
+
+    def test_bag_graph_cycle(self):
+        g = BagGraph.parse("a b bags contain 1 c d bag.\nc d bags contain 2 a b bags.\ne f bags contain 1 a b bag.")
+        self.assertRaises(ValueError, g.count_containers, 'a b')
+        self.assertRaises(ValueError, g.count_contents, 'e f')
 
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
         with open(sys.argv[1], 'r') as infile:
-            content = infile.read()
-            print(part1(content))
-            print(part2(content))
+            graph = BagGraph.parse(infile.read())
+            print(part1(graph))
+            print(part2(graph))
     else:
         unittest.main()
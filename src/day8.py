@@ -1,23 +1,42 @@
 import unittest
-from typing import Tuple, List
+from array import array
+from typing import Tuple, List, Optional
 
 import sys
 
+NOP, ACC, JMP = 0, 1, 2
+OPCODES = {"nop": NOP, "acc": ACC, "jmp": JMP}
+
 
 def run_program(instructions: List[str]) -> Tuple[bool, int]:
-    pc, acc, hist = 0, 0, set()
-    while pc < len(instructions):
-        op, arg = decode(instructions[pc])
-        if op == "nop":
+    return run_compiled(*compile_program(instructions))
+
+
+def compile_program(instructions: List[str]) -> Tuple[array, array]:
+    ops, args = array('b'), array('q')
+    for instruction in instructions:
+        op, arg = decode(instruction)
+        ops.append(OPCODES[op])
+        args.append(arg)
+    return ops, args
+
+
+def run_compiled(ops: array, args: array) -> Tuple[bool, int]:
+    n = len(ops)
+    pc, acc, seen = 0, 0, bytearray(n)
+    while pc < n:
+        op = ops[pc]
+        if op == ACC:
+            acc += args[pc]
             pc += 1
-        elif op == "acc":
-            acc += arg
+        elif op == JMP:
+            pc += args[pc]
+        else:
             pc += 1
-        elif op == "jmp":
-            pc += arg
-        if pc in hist:
-            return False, acc
-        hist.add(pc)
+        if pc < n:
+            if seen[pc]:
+                return False, acc
+            seen[pc] = 1
     return True, acc
 
 
@@ -26,14 +45,34 @@ def decode(instruction: str) -> Tuple[str, int]:
     return op, int(arg)
 
 
-def break_loop(instructions: List[str]) -> int:
-    for i, instr in enumerate(instructions):
-        if instr.startswith('jmp'):
-            new_instructions = instructions[:]
-            new_instructions[i] = 'nop +0'
-            done, acc = run_program(new_instructions)
+def break_loop(instructions: List[str]) -> Optional[int]:
+    # ends[i]: the unpatched program terminates when started at i.
+    ops, args = compile_program(instructions)
+    n = len(ops)
+    succ = [i + args[i] if ops[i] == JMP else i + 1 for i in range(n)]
+    preds = [[] for _ in range(n)]
+    ends, stack = bytearray(n), []
+    for i, t in enumerate(succ):
+        if t >= n:
+            ends[i] = 1
+            stack.append(i)
+        elif t >= 0:
+            preds[t].append(i)
+    while stack:
+        for p in preds[stack.pop()]:
+            if not ends[p]:
+                ends[p] = 1
+                stack.append(p)
+    pc, visited = 0, bytearray(n)
+    while 0 <= pc < n and not visited[pc]:
+        visited[pc] = 1
+        if ops[pc] == JMP and (pc + 1 >= n or ends[pc + 1]):
+            ops[pc] = NOP
+            done, acc = run_compiled(ops, args)
             if done:
                 return acc
+            ops[pc] = JMP
+        pc = succ[pc]
 
 
 def part1(instructions: List[str]) -> None:
@@ -61,11 +100,18 @@ acc +6""".split('\n')
         self.assertEqual(('jmp', -7), decode('jmp -7'))
         self.assertEqual(('nop', 0), decode('nop +0'))
 
+    def test_compile_program(self):
+        ops, args = compile_program(self.instructions[:3])
+        self.assertEqual([NOP, ACC, JMP], list(ops))
+        self.assertEqual([0, 1, 4], list(args))
+
     def test_run_program(self):
         self.assertEqual((False, 5), run_program(self.instructions))
 
     def test_break_loop(self):
         self.assertEqual(8, break_loop(self.instructions))
+        self.assertEqual(1, break_loop(['acc +1', 'jmp -1']))
+        self.assertIsNone(break_loop(['acc +1', 'nop +0', 'jmp -2', 'jmp -3']))
 
 
 if __name__ == '__main__':
@@ -1,18 +1,54 @@
 import unittest
-from typing import List
+from array import array
+from collections import Counter, deque
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import sys
 
 
-def find_first_invalid(nums: List[int], k: int) -> int:
-    for i in range(k, len(nums)):
-        n, prev, ok = nums[i], set(nums[i - k: i]), False
-        for p in prev:
-            d = n - p
-            if d in prev and d != p:
-                ok = True
-                break
-        if not ok:
+class XmasValidator:
+
+    def __init__(self, k: int):
+        # Multisets of the last k numbers and of the sums of their pairs of distinct values
+        self.k = k
+        self.window = deque()
+        self.counts = Counter()
+        self.sums = Counter()
+
+    def push(self, n: int) -> bool:
+        valid = len(self.window) < self.k or n in self.sums
+        for m, c in self.counts.items():
+            if m != n:
+                self.sums[n + m] += c
+        self.counts[n] += 1
+        self.window.append(n)
+        if len(self.window) > self.k:
+            self.evict(self.window.popleft())
+        return valid
+
+    def evict(self, n: int) -> None:
+        self.counts[n] -= 1
+        if not self.counts[n]:
+            del self.counts[n]
+        for m, c in self.counts.items():
+            if m != n:
+                s = n + m
+                self.sums[s] -= c
+                if not self.sums[s]:
+                    del self.sums[s]
+
+
+def read_ints(fname: str) -> Iterator[int]:
+    with open(fname) as infile:
+        for line in infile:
+            if line.strip():
+                yield int(line)
+
+
+def find_first_invalid(nums: Iterable[int], k: int) -> int:
+    validator = XmasValidator(k)
+    for n in nums:
+        if not validator.push(n):
             return n
 
 
@@ -28,13 +64,46 @@ def find_subarray_sum(nums: List[int], k: int) -> List[int]:
         i += 1
 
 
-def part1(nums: List[int]) -> None:
+def find_subarray_min_max(nums: Iterable[int], k: int) -> Optional[Tuple[int, int]]:
+    # lows and highs are monotonic deques holding the window's min and max at the front.
+    window, lows, highs, crt_sum = deque(), deque(), deque(), 0
+    for n in nums:
+        window.append(n)
+        crt_sum += n
+        while lows and lows[-1] > n:
+            lows.pop()
+        lows.append(n)
+        while highs and highs[-1] < n:
+            highs.pop()
+        highs.append(n)
+        while crt_sum > k and len(window) > 2:
+            m = window.popleft()
+            crt_sum -= m
+            if lows[0] == m:
+                lows.popleft()
+            if highs[0] == m:
+                highs.popleft()
+        if crt_sum == k and len(window) > 1:
+            return lows[0], highs[0]
+
+
+def find_weakness(nums: Iterable[int], k: int) -> Tuple[int, Optional[int]]:
+    validator, seen = XmasValidator(k), array('q')
+    for n in nums:
+        if not validator.push(n):
+            bounds = find_subarray_min_max(seen, n)
+            return n, sum(bounds) if bounds else None
+        seen.append(n)
+    return None, None
+
+
+def part1(nums: Iterable[int]) -> None:
     print(find_first_invalid(nums, 25))
 
 
-def part2(nums: List[int]) -> None:
-    arr = find_subarray_sum(nums, 20874512)
-    print(min(arr) + max(arr))
+def part2(nums: Iterable[int]) -> None:
+    _, weakness = find_weakness(nums, 25)
+    print(weakness)
 
 
 class Test(unittest.TestCase):
@@ -45,16 +114,35 @@ class Test(unittest.TestCase):
 
     def test_find_first_invalid(self):
         self.assertEqual(127, find_first_invalid(self.data, 5))
+        self.assertEqual(127, find_first_invalid(iter(self.data), 5))
+        self.assertEqual(10, find_first_invalid([5, 5, 10], 2))
+        self.assertIsNone(find_first_invalid([1, 2, 3, 5, 8], 2))
+
+    def test_xmas_validator(self):
+        v = XmasValidator(3)
+        for n in (1, 2, 3):
+            self.assertTrue(v.push(n))
+        self.assertTrue(v.push(5))
+        self.assertFalse(v.push(2))
+        self.assertEqual([3, 5, 2], list(v.window))
+        self.assertEqual({8: 1, 5: 1, 7: 1}, dict(v.sums))
 
     def test_find_subarray_sum(self):
         self.assertEqual([15, 25, 47, 40], find_subarray_sum(self.data, 127))
 
+    def test_find_subarray_min_max(self):
+        self.assertEqual((15, 47), find_subarray_min_max(iter(self.data), 127))
+        self.assertEqual((3, 5), find_subarray_min_max([9, 5, 3, 5, 1], 13))
+        self.assertIsNone(find_subarray_min_max([10, 20, 30], 20))
+
+    def test_find_weakness(self):
+        self.assertEqual((127, 62), find_weakness(iter(self.data), 5))
+        self.assertEqual((None, None), find_weakness([1, 2, 3], 2))
+
 
 if __name__ == '__main__':
     if len(sys.argv) == 2:
-        with open(sys.argv[1], 'r') as infile:
-            ns = [int(s) for s in infile.read().split('\n') if s]
-            part1(ns)
-            part2(ns)
+        part1(read_ints(sys.argv[1]))
+        part2(read_ints(sys.argv[1]))
     else:
         unittest.main()
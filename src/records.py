@@ -0,0 +1,39 @@
+import io
+import sys
+import unittest
+from typing import Iterable, Iterator, List
+
+
+def read_records(lines: Iterable[str]) -> Iterator[List[str]]:
+    record = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            record.append(line)
+        elif record:
+            yield record
+            record = []
+    if record:
+        yield record
+
+
+def read_record_file(fname: str, chunk_size: int = 1 << 16) -> Iterator[List[str]]:
+    with open(fname, 'r', buffering=chunk_size) as infile:
+        yield from read_records(infile)
+
+
+class Test(unittest.TestCase):
+
+    def test_read_records(self):
+        s = "a b\nc\n\n  \n\nd\n   \ne f\n"
+        self.assertEqual([['a b', 'c'], ['d'], ['e f']], list(read_records(io.StringIO(s))))
+        self.assertEqual([['x']], list(read_records(['x'])))
+        self.assertEqual([], list(read_records([])))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 2:
+        for r in read_record_file(sys.argv[1]):
+            print(r)
+    else:
+        unittest.main()
@@ -0,0 +1,174 @@
+import argparse
+import ast
+import importlib.util
+import io
+import json
+import os
+import re
+import sys
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from types import CodeType, ModuleType
+from typing import List, NamedTuple, Optional, Tuple, Iterable
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIR = os.path.join(os.path.dirname(SRC_DIR), 'input')
+PARTS = ('part1', 'part2')
+
+
+class DayReport(NamedTuple):
+    day: int
+    answers: List[str]
+    timings: List[Tuple[str, float]]
+    total: float
+    error: Optional[str] = None
+
+
+def find_days() -> List[int]:
+    days = []
+    for name in os.listdir(SRC_DIR):
+        m = re.fullmatch(r'day(\d+)\.py', name)
+        if m:
+            days.append(int(m[1]))
+    days.sort()
+    return days
+
+
+def input_path(day: int) -> str:
+    return os.path.join(INPUT_DIR, f'day{day}.txt')
+
+
+def load_day(day: int) -> ModuleType:
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    path = os.path.join(SRC_DIR, f'day{day}.py')
+    spec = importlib.util.spec_from_file_location(f'day{day}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main_block(module: ModuleType) -> CodeType:
+    with open(module.__file__, 'r') as infile:
+        tree = ast.parse(infile.read())
+    for node in tree.body:
+        if isinstance(node, ast.If) and isinstance(node.test, ast.Compare):
+            left = node.test.left
+            if isinstance(left, ast.Name) and left.id == '__name__':
+                return compile(ast.Module(body=node.body, type_ignores=[]), module.__file__, 'exec')
+    raise ValueError(f'no __main__ block in {module.__file__}')
+
+
+def timed(name: str, fn, timings: List[Tuple[str, float]], active: List[str]):
+    # Only the outermost part call is timed (day24's part2 calls part1).
+    def wrapper(*args, **kwargs):
+        if active:
+            return fn(*args, **kwargs)
+        active.append(name)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings.append((name, time.perf_counter() - start))
+            active.pop()
+
+    return wrapper
+
+
+def run_day(day: int, path: str = None) -> DayReport:
+    module = load_day(day)
+    timings, active = [], []
+    for name in PARTS:
+        fn = getattr(module, name, None)
+        if fn:
+            setattr(module, name, timed(name, fn, timings, active))
+    code, out, error = main_block(module), io.StringIO(), None
+    argv = sys.argv
+    sys.argv = [module.__file__, path or input_path(day)]
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(out):
+            exec(code, module.__dict__)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        sys.argv = argv
+    total = time.perf_counter() - start
+    answers = [line for line in out.getvalue().split('\n') if line]
+    return DayReport(day, answers, timings, total, error)
+
+
+def run_days(days: Iterable[int], workers: Optional[int] = None) -> List[DayReport]:
+    days = list(days)
+    if workers == 1:
+        return [run_day(d) for d in days]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_day, days))
+
+
+def format_report(reports: List[DayReport], wall: float) -> str:
+    lines = []
+    for r in reports:
+        parts = ', '.join(f'{name} {secs:.3f}s' for name, secs in r.timings)
+        lines.append(f'day{r.day:<3} {r.total:8.3f}s  [{parts}]')
+        for a in r.answers:
+            lines.append(f'    {a}')
+        if r.error:
+            lines.append(f'    error: {r.error}')
+    cpu = sum(r.total for r in reports)
+    lines.append(f'{len(reports)} days in {wall:.3f}s (sum of days {cpu:.3f}s)')
+    return '\n'.join(lines)
+
+
+def parse_days(args: List[str]) -> List[int]:
+    if not args or args == ['all']:
+        return find_days()
+    return [int(a) for a in args]
+
+
+class Test(unittest.TestCase):
+
+    def test_find_days(self):
+        days = find_days()
+        self.assertEqual(1, days[0])
+        self.assertIn(25, days)
+
+    def test_run_day(self):
+        report = run_day(1)
+        self.assertIsNone(report.error)
+        self.assertEqual(2, len(report.answers))
+        self.assertEqual(['part1', 'part2'], [name for name, _ in report.timings])
+
+    def test_nested_parts_timed_once(self):
+        report = run_day(24)
+        self.assertIsNone(report.error)
+        self.assertEqual(['part1', 'part2'], [name for name, _ in report.timings])
+
+    def test_run_day_missing_input(self):
+        report = run_day(1, os.path.join(INPUT_DIR, 'missing.txt'))
+        self.assertEqual([], report.answers)
+        self.assertTrue(report.error.startswith('FileNotFoundError'))
+
+    def test_parse_days(self):
+        self.assertEqual(find_days(), parse_days(['all']))
+        self.assertEqual([3, 5], parse_days(['3', '5']))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description='Run all (or some) days in one process pool.')
+        parser.add_argument('days', nargs='*', help="day numbers or 'all'")
+        parser.add_argument('-w', '--workers', type=int, default=None, help='pool size, 1 runs in-process')
+        parser.add_argument('--json', action='store_true', help='print the report as JSON')
+        opts = parser.parse_args()
+        t0 = time.perf_counter()
+        results = run_days(parse_days(opts.days), opts.workers)
+        elapsed = time.perf_counter() - t0
+        if opts.json:
+            print(json.dumps({'wall': elapsed, 'days': [r._asdict() for r in results]}, indent=2))
+        else:
+            print(format_report(results, elapsed))
+    else:
+        unittest.main()